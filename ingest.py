@@ -0,0 +1,292 @@
+"""
+Servicio de ingesta para archivos de GLS descargados manualmente.
+Vigila la carpeta de descargas mediante eventos del sistema de archivos y pasa
+cada exportación nueva por las mismas etapas que el RPA (detección, lectura,
+conciliación y escritura), sin necesidad de abrir el navegador.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from log_config import setup_logging
+from rpa import load_config, sniff_file_format, parse_gls_file, get_data_ps, reconcile_orders
+
+# watchdog es necesario para recibir los eventos de la carpeta
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    watchdog_available = True
+except ImportError:
+    FileSystemEventHandler = object
+    watchdog_available = False
+
+logger = logging.getLogger("Toolstock-GLS RPA Ingest")
+
+# Extensiones que exporta la extranet de GLS
+GLS_EXTENSIONS = ['.xls', '.xlsx']
+
+# Columnas mínimas que debe tener una exportación de GLS para poder conciliarla
+GLS_REQUIRED_COLUMNS = ['DptoDst']
+
+# Registro de hashes ya procesados, guardado dentro de la carpeta de descargas
+LEDGER_FILENAME = ".gls_ingested.json"
+
+def file_sha256(file_path):
+    """Calcula el hash SHA-256 del contenido de un archivo."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def is_gls_export(file_path):
+    """Indica si la ruta corresponde a un archivo exportado de GLS que se debe ingerir."""
+    filename = os.path.basename(file_path)
+    if filename.startswith('.') or filename.startswith('~$'):
+        return False
+    return os.path.splitext(filename)[1].lower() in GLS_EXTENSIONS
+
+def wait_until_stable(file_path, settle_seconds, max_wait):
+    """Espera a que el archivo deje de crecer. Devuelve False si desaparece o no se estabiliza."""
+    waited = 0
+    last_size = -1
+    while waited < max_wait:
+        if not os.path.exists(file_path):
+            return False
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return False
+        if size == last_size and size > 0:
+            return True
+        last_size = size
+        time.sleep(settle_seconds)
+        waited += settle_seconds
+    return False
+
+class IngestLedger:
+    """Registro persistente de los hashes de contenido ya ingeridos."""
+
+    def __init__(self, ledger_path):
+        self.ledger_path = ledger_path
+        self.lock = threading.Lock()
+        self.in_progress = set()
+        self.entries = {}
+        if os.path.exists(ledger_path):
+            try:
+                with open(ledger_path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                logger.warning(f"No se pudo leer el registro de ingesta, se empieza vacío: {e}")
+
+    def claim(self, digest):
+        """Reserva un hash para procesarlo. Devuelve False si ya se procesó o está en curso."""
+        with self.lock:
+            if digest in self.entries or digest in self.in_progress:
+                return False
+            self.in_progress.add(digest)
+            return True
+
+    def is_processed(self, digest):
+        """Indica si el hash ya está registrado como procesado."""
+        with self.lock:
+            return digest in self.entries
+
+    def release(self, digest):
+        """Libera un hash reservado sin marcarlo como procesado."""
+        with self.lock:
+            self.in_progress.discard(digest)
+
+    def commit(self, digest, source_path, output_path):
+        """Marca un hash como procesado y guarda el registro en disco."""
+        with self.lock:
+            self.in_progress.discard(digest)
+            self.entries[digest] = {
+                "source": os.path.basename(source_path),
+                "output": output_path,
+                "processed_at": datetime.now().isoformat(timespec='seconds'),
+            }
+            tmp_path = self.ledger_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.ledger_path)
+
+def quarantine_file(file_path, config):
+    """Mueve un archivo que no se pudo leer a la carpeta de cuarentena."""
+    quarantine_folder = config["paths"]["quarantine_folder"]
+    try:
+        os.makedirs(quarantine_folder, exist_ok=True)
+        filename = os.path.basename(file_path)
+        target = os.path.join(quarantine_folder, filename)
+        if os.path.exists(target):
+            stem, ext = os.path.splitext(filename)
+            target = os.path.join(quarantine_folder, f"{stem}_{datetime.now().strftime('%Y%m%d%H%M%S')}{ext}")
+        shutil.move(file_path, target)
+        logger.warning(f"Archivo movido a cuarentena: {target}")
+        return target
+    except Exception as e:
+        logger.error(f"Error al mover el archivo a cuarentena: {e}")
+        return None
+
+def ingest_file(file_path, config, ledger):
+    """Procesa un archivo de GLS descargado manualmente y lo guarda como XLSX en la carpeta final."""
+    digest = None
+    try:
+        if not wait_until_stable(file_path, config["ingest"]["settle_seconds"], config["ingest"]["max_wait"]):
+            logger.info(f"Archivo pendiente, no existe o no terminó de descargarse: {file_path}")
+            return False
+
+        digest = file_sha256(file_path)
+        if not ledger.claim(digest):
+            logger.info(f"Archivo duplicado, ya fue procesado: {file_path}")
+            digest = None
+            return False
+
+        logger.info(f"Ingiriendo archivo: {file_path}")
+
+        # Detectar el formato real y leer el archivo
+        file_format = sniff_file_format(file_path)
+        df = parse_gls_file(file_path, file_format)
+        if df is None:
+            quarantine_file(file_path, config)
+            ledger.release(digest)
+            return False
+
+        # Comprobar que es realmente una exportación de GLS y no otra hoja de cálculo
+        missing_columns = [column for column in GLS_REQUIRED_COLUMNS if column not in df.columns]
+        if missing_columns:
+            logger.warning(f"El archivo no parece una exportación de GLS, faltan columnas {missing_columns}: {file_path}")
+            quarantine_file(file_path, config)
+            ledger.release(digest)
+            return False
+
+        # Conciliar con los pedidos de PrestaShop; si falla, se conserva el archivo para reintentarlo
+        try:
+            df = reconcile_orders(df, get_data_ps(config))
+        except Exception as e:
+            logger.error(f"No se pudo conciliar con PrestaShop, el archivo se reintentará más tarde: {e}")
+            ledger.release(digest)
+            return False
+
+        # Guardar como XLSX con el nombre del origen más el inicio del hash para no sobrescribir
+        # resultados anteriores ni los {fecha}.xlsx que genera el RPA
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        final_path = os.path.join(config["paths"]["final_folder"], f"{stem}_{digest[:8]}.xlsx")
+        df.to_excel(final_path, index=False)
+
+        ledger.commit(digest, file_path, final_path)
+        logger.info(f"Archivo ingerido y guardado como XLSX: {final_path}")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error al ingerir el archivo {file_path}: {e}")
+        if digest:
+            ledger.release(digest)
+        return False
+
+class DownloadFolderHandler(FileSystemEventHandler):
+    """Envía al pool de trabajo los archivos nuevos que aparecen en la carpeta de descargas."""
+
+    def __init__(self, executor, config, ledger):
+        super().__init__()
+        self.executor = executor
+        self.config = config
+        self.ledger = ledger
+        self.lock = threading.Lock()
+        self.queued = set()
+        self.pending = set()
+
+    def submit(self, file_path):
+        if not is_gls_export(file_path):
+            return
+        with self.lock:
+            if file_path in self.queued:
+                return
+            self.queued.add(file_path)
+            self.pending.discard(file_path)
+        self.executor.submit(self.ingest, file_path)
+
+    def ingest(self, file_path):
+        """Ingiere el archivo y lo deja pendiente de reintento si el fallo no fue definitivo."""
+        retry = False
+        if not ingest_file(file_path, self.config, self.ledger):
+            # Se reintenta si el archivo sigue en la carpeta (no se movió a cuarentena)
+            # y su contenido no se ha ingerido ya
+            try:
+                retry = os.path.exists(file_path) and not self.ledger.is_processed(file_sha256(file_path))
+            except OSError:
+                retry = False
+        with self.lock:
+            self.queued.discard(file_path)
+            if retry:
+                self.pending.add(file_path)
+
+    def retry_pending(self):
+        """Vuelve a enviar al pool los archivos cuyo último intento falló por una causa temporal."""
+        with self.lock:
+            pending = list(self.pending)
+        if pending:
+            logger.info(f"Reintentando {len(pending)} archivos pendientes")
+        for file_path in pending:
+            self.submit(file_path)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.submit(event.src_path)
+
+    def on_moved(self, event):
+        # Chrome descarga en un .crdownload y lo renombra al terminar
+        if not event.is_directory:
+            self.submit(event.dest_path)
+
+def run_ingest():
+    """Ejecuta el servicio de ingesta hasta que se interrumpa con Ctrl+C."""
+    if not watchdog_available:
+        logger.error("watchdog no está disponible, no se puede vigilar la carpeta de descargas")
+        return False
+
+    config = load_config()
+    download_folder = config["paths"]["download_folder"]
+    if not download_folder or not os.path.isdir(download_folder):
+        logger.error(f"La carpeta de descargas no existe: {download_folder}")
+        return False
+
+    ledger = IngestLedger(os.path.join(download_folder, LEDGER_FILENAME))
+    executor = ThreadPoolExecutor(max_workers=config["ingest"]["workers"])
+    handler = DownloadFolderHandler(executor, config, ledger)
+
+    observer = Observer()
+    observer.schedule(handler, download_folder, recursive=False)
+    observer.start()
+    logger.info(f"Vigilando la carpeta de descargas: {download_folder}")
+
+    try:
+        # Procesar también los archivos que ya estaban en la carpeta al arrancar
+        for filename in sorted(os.listdir(download_folder)):
+            file_path = os.path.join(download_folder, filename)
+            if os.path.isfile(file_path):
+                handler.submit(file_path)
+
+        # Reintentar periódicamente los archivos que fallaron (base de datos caída, descarga lenta...)
+        last_retry = time.monotonic()
+        while observer.is_alive():
+            observer.join(1)
+            if time.monotonic() - last_retry >= config["ingest"]["retry_seconds"]:
+                handler.retry_pending()
+                last_retry = time.monotonic()
+    except KeyboardInterrupt:
+        logger.info("Deteniendo el servicio de ingesta")
+    finally:
+        observer.stop()
+        observer.join()
+        executor.shutdown(wait=True)
+    return True
+
+if __name__ == "__main__":
+    setup_logging("rpa_ingest.log", "INGEST_LOG_FILE")
+    run_ingest()
@@ -0,0 +1,115 @@
+"""
+Configuración de logging del proceso RPA.
+Los módulos solo obtienen su logger; el punto de entrada llama una vez a
+setup_logging(), que envía los registros a una cola atendida por un hilo en
+segundo plano que escribe en un archivo rotativo y, opcionalmente, en consola.
+"""
+import os
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+from dotenv import load_dotenv
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como una línea JSON."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+def _env_flag(name, default):
+    """Lee una variable de entorno booleana (1/0, true/false, yes/no)."""
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+def _env_int(name, default, warnings):
+    """Lee una variable de entorno entera; si está vacía o no es válida usa el valor por defecto."""
+    value = os.getenv(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        warnings.append(f"{name} no es un número válido ({value}), se usa {default}")
+        return default
+
+def setup_logging(log_file="rpa_shipments.log", log_file_env="LOG_FILE"):
+    """
+    Configura el logging del proceso una sola vez y devuelve el QueueListener en marcha.
+    Cada punto de entrada debe usar su propio archivo: los handlers rotativos no admiten
+    que dos procesos escriban en el mismo archivo (en Windows la rotación falla).
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    load_dotenv()
+    # Los avisos de configuración se registran cuando el logging ya está en marcha
+    warnings = []
+    log_file = os.getenv(log_file_env) or log_file
+    level = (os.getenv('LOG_LEVEL') or 'INFO').strip().upper()
+    if not isinstance(logging.getLevelName(level), int):
+        warnings.append(f"LOG_LEVEL no es un nivel válido ({level}), se usa INFO")
+        level = 'INFO'
+    max_bytes = _env_int('LOG_MAX_BYTES', 5 * 1024 * 1024, warnings)
+    backup_count = _env_int('LOG_BACKUP_COUNT', 5, warnings)
+    rotate_when = os.getenv('LOG_ROTATE_WHEN')
+    use_json = _env_flag('LOG_JSON', False)
+    use_console = _env_flag('LOG_CONSOLE', True)
+
+    log_dir = os.path.dirname(log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    # Rotación por tiempo si se indica LOG_ROTATE_WHEN (p. ej. "midnight"), si no por tamaño
+    file_handler = None
+    if rotate_when:
+        try:
+            # delay=True: si "when" no es válido el handler falla sin haber abierto el archivo
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                log_file, when=rotate_when, backupCount=backup_count, encoding='utf-8', delay=True
+            )
+        except ValueError:
+            warnings.append(f"LOG_ROTATE_WHEN no es válido ({rotate_when}), se rota por tamaño")
+    if file_handler is None:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+    file_handler.setFormatter(JsonFormatter() if use_json else logging.Formatter(LOG_FORMAT))
+    handlers = [file_handler]
+
+    if use_console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(console_handler)
+
+    # Los registros se encolan sin bloquear y un hilo del QueueListener los escribe
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    for warning in warnings:
+        logging.getLogger(__name__).warning(warning)
+    return _listener
@@ -3,17 +3,9 @@ Punto de entrada principal para la aplicación RPA de envíos GLS.
 Implementado con Selenium WebDriver para mayor robustez y fiabilidad.
 """
 import logging
+from log_config import setup_logging
 from rpa import rpa_shipments
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("rpa_shipments.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("Toolstock-GLS RPA Main")
 
 def run_rpa():
@@ -32,4 +24,5 @@ def run_rpa():
         return False
 
 if __name__ == "__main__":
+    setup_logging()
     run_rpa()
\ No newline at end of file
@@ -4,8 +4,11 @@ Este módulo proporciona funciones para interactuar con la interfaz web de GLS
 y descargar informes de envíos.
 """
 import os
+import json
 import time
+import threading
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from dotenv import load_dotenv
 from selenium import webdriver
@@ -23,15 +26,6 @@ try:
 except ImportError:
     webdriver_manager_available = False
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("rpa_shipments.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("Toolstock-GLS RPA")
 
 def load_config():
@@ -43,12 +37,21 @@ def load_config():
     password_gls = os.getenv('PASSWORD_GLS')
     download_folder = os.getenv('PATH_DOWNLOAD_FOLDER')
     final_folder = os.getenv('PATH_FINAL_FOLDER')
+    quarantine_folder = os.getenv('PATH_QUARANTINE_FOLDER')
+    if not quarantine_folder and download_folder:
+        quarantine_folder = os.path.join(download_folder, "quarantine")
     host_db = os.getenv('HOST_DB')
     port_db = os.getenv('PORT_DB')
     database_db = os.getenv('DATABASE_DB')
     user_db = os.getenv('USER_DB')
     password_db = os.getenv('PASSWORD_DB')
     days_ago = os.getenv('DAYS_AGO')
+    try:
+        ingest_workers = max(1, int(os.getenv('INGEST_WORKERS') or 2))
+    except ValueError:
+        logger.warning(f"INGEST_WORKERS no es un número válido ({os.getenv('INGEST_WORKERS')}), se usan 2")
+        ingest_workers = 2
+    reports_file = os.getenv('PATH_REPORTS_FILE')
 
 
     CONFIG = {
@@ -63,6 +66,7 @@ def load_config():
         "paths" : {
             "download_folder": download_folder,
             "final_folder":final_folder,
+            "quarantine_folder": quarantine_folder,
         },
         "timeouts":{
             "page_load": 10,
@@ -80,10 +84,101 @@ def load_config():
             "user": user_db,
             "password": password_db,
         },
-        "time_ago": days_ago
+        "ingest":{
+            "workers": ingest_workers,
+            "settle_seconds": 2,
+            "max_wait": 60,
+            "retry_seconds": 60,
+        },
+        "time_ago": int(days_ago or 0)
     }
+    CONFIG["reports"] = load_reports(CONFIG, reports_file)
     return CONFIG
 
+def load_reports(config, reports_file=None):
+    """Devuelve las definiciones de informes a descargar: envíos más los del archivo JSON opcional."""
+    reports = [{
+        "name": "shipments",
+        "url": config["urls"]["shipments"],
+        "date_fields": ["fechadesde", "fechahasta"],
+        "search_button": "btBuscar",
+        "export_button": "btXLS",
+        "results_id": "envios",
+        "output_name": "{date}.xlsx",
+        "reconcile": True,
+    }]
+    
+    if reports_file:
+        try:
+            with open(reports_file, 'r', encoding='utf-8') as f:
+                extra_reports = json.load(f)
+            
+            # Nombres reservados: el de la carpeta de cuarentena del servicio de ingesta
+            reserved_names = {"quarantine"}
+            if config["paths"]["quarantine_folder"]:
+                reserved_names.add(os.path.basename(os.path.normpath(config["paths"]["quarantine_folder"])))
+            
+            loaded = 0
+            for index, report in enumerate(extra_reports):
+                error = validate_report(report, reports, reserved_names)
+                if error:
+                    logger.error(f"Informe {index + 1} de {reports_file} descartado: {error}")
+                    continue
+                report.setdefault("results_id", None)
+                report.setdefault("reconcile", False)
+                reports.append(report)
+                loaded += 1
+            logger.info(f"Cargados {loaded} informes adicionales desde {reports_file}")
+        except Exception as e:
+            logger.error(f"Error al cargar las definiciones de informes de {reports_file}: {e}")
+    
+    return reports
+
+def validate_report(report, reports, reserved_names):
+    """Devuelve un mensaje de error si la definición del informe no es válida, o None si lo es."""
+    if not isinstance(report, dict):
+        return "la definición no es un objeto JSON"
+    
+    for key in ["name", "url", "search_button", "export_button", "output_name"]:
+        if not isinstance(report.get(key), str) or not report[key].strip():
+            return f"falta el campo '{key}'"
+    
+    date_fields = report.get("date_fields")
+    if not isinstance(date_fields, list) or not date_fields or not all(isinstance(f, str) and f for f in date_fields):
+        return "'date_fields' debe ser una lista no vacía de ids"
+    
+    # El nombre se usa como carpeta de descargas dentro de PATH_DOWNLOAD_FOLDER
+    name = report["name"]
+    if name.startswith('.') or os.sep in name or '/' in name or name in reserved_names:
+        return f"el nombre '{name}' no se puede usar como carpeta de descargas"
+    if any(name == other["name"] for other in reports):
+        return f"el nombre '{name}' está repetido"
+    
+    # El archivo de salida se escribe dentro de PATH_FINAL_FOLDER con df.to_excel
+    output_name = report["output_name"]
+    try:
+        sample_output = output_name.format(date="00000000")
+    except (KeyError, ValueError, IndexError):
+        return f"el archivo de salida '{output_name}' solo admite el marcador {{date}}"
+    if os.path.isabs(output_name) or any(part in output_name for part in ['/', '\\', ':', '..']):
+        return f"el archivo de salida '{output_name}' debe ser un nombre de archivo, no una ruta"
+    if os.path.splitext(sample_output)[1].lower() != ".xlsx":
+        return f"el archivo de salida '{output_name}' debe tener extensión .xlsx"
+    if any(sample_output.lower() == other["output_name"].format(date="00000000").lower() for other in reports):
+        return f"el archivo de salida '{output_name}' ya lo usa otro informe"
+    
+    if "reconcile" in report and not isinstance(report["reconcile"], bool):
+        return "'reconcile' debe ser true o false"
+    if report.get("results_id") is not None and not isinstance(report["results_id"], str):
+        return "'results_id' debe ser un id o null"
+    return None
+
+def get_report_download_folder(config, report):
+    """Devuelve (y crea si hace falta) la carpeta de descargas propia de un informe."""
+    folder = os.path.join(config["paths"]["download_folder"], report["name"])
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
 def get_current_date_formatted(config):
     """Devuelve la fecha actual en formato dd/mm/yyyy."""
     return (datetime.now() - timedelta(days=config["time_ago"])).strftime("%d/%m/%Y")
@@ -95,7 +190,7 @@ def get_date_for_filename(config):
 
      
 
-def setup_selenium_driver(config):
+def setup_selenium_driver(config, download_folder=None):
     """Configura y devuelve un WebDriver de Selenium para Chrome."""
     try:
         # Configurar opciones de Chrome
@@ -105,7 +200,7 @@ def setup_selenium_driver(config):
         
         # Configurar directorio de descargas
         prefs = {
-            "download.default_directory": config["paths"]["download_folder"],
+            "download.default_directory": download_folder or config["paths"]["download_folder"],
             "download.prompt_for_download": False,
             "download.directory_upgrade": True,
             "safebrowsing.enabled": True
@@ -225,78 +320,104 @@ def login_to_gls(driver, config):
         logger.error(f"Error durante el login: {e}")
         return False
 
-def navigate_to_shipments(driver, config):
-    """Navega a la página de búsqueda de envíos."""
+def share_session(session_cookies, target_driver, config, report):
+    """Copia las cookies de la sesión ya iniciada a target_driver para no repetir el login."""
     try:
-        logger.info(f"Navegando a la página de envíos: {config['urls']['shipments']}")
-        driver.get(config["urls"]["shipments"])
+        # Selenium solo permite añadir cookies del dominio que está cargado
+        target_driver.get(config["urls"]["login"])
+        for cookie in session_cookies:
+            try:
+                target_driver.add_cookie(cookie)
+            except Exception as e:
+                logger.warning(f"No se pudo copiar la cookie {cookie.get('name')}: {e}")
+        
+        # Comprobar que la sesión es válida: la página del informe no debe redirigir al login
+        target_driver.get(report["url"])
+        try:
+            WebDriverWait(target_driver, config["timeouts"]["element_present"]).until(
+                EC.url_contains("Extranet")
+            )
+        except TimeoutException:
+            logger.error(f"[{report['name']}] La sesión no se pudo compartir, la extranet redirige al login: {target_driver.current_url}")
+            return False
+        
+        logger.info(f"[{report['name']}] Sesión compartida con el nuevo navegador")
+        return True
+    except Exception as e:
+        logger.error(f"[{report['name']}] Error al compartir la sesión: {e}")
+        return False
+
+def navigate_to_report(driver, config, report):
+    """Navega a la página de búsqueda de un informe."""
+    try:
+        logger.info(f"[{report['name']}] Navegando a la página del informe: {report['url']}")
+        driver.get(report["url"])
         
         # Esperar a que cargue la página de búsqueda
         WebDriverWait(driver, config["timeouts"]["element_present"]).until(
-            EC.presence_of_element_located((By.ID, "fechadesde"))
+            EC.presence_of_element_located((By.ID, report["date_fields"][0]))
         )
         
-        logger.info("Navegación a página de envíos exitosa")
+        logger.info(f"[{report['name']}] Navegación a página del informe exitosa")
         return True
     except Exception as e:
-        logger.error(f"Error al navegar a la página de envíos: {e}")
+        logger.error(f"[{report['name']}] Error al navegar a la página del informe: {e}")
         return False
 
-def search_shipments(driver, config):
-    """Realiza la búsqueda de envíos para la fecha actual."""
+def search_report(driver, config, report):
+    """Realiza la búsqueda de un informe para la fecha configurada."""
     try:
-        logger.info("Realizando búsqueda de envíos")
+        logger.info(f"[{report['name']}] Realizando búsqueda")
         current_date = get_current_date_formatted(config)
         
         # Localizar e ingresar fechas
-        from_date_field = driver.find_element(By.ID, "fechadesde")
-        from_date_field.clear()
-        from_date_field.send_keys(current_date)
-        
-        to_date_field = driver.find_element(By.ID, "fechahasta")
-        to_date_field.clear()
-        to_date_field.send_keys(current_date)
+        for field_id in report["date_fields"]:
+            date_field = driver.find_element(By.ID, field_id)
+            date_field.clear()
+            date_field.send_keys(current_date)
         
         # Iniciar búsqueda
-        search_button = driver.find_element(By.ID, "btBuscar")
+        search_button = driver.find_element(By.ID, report["search_button"])
         search_button.click()
         
         # Esperar a que se complete la búsqueda (puede variar según la página)
         try:
             # Esperamos a que aparezca el botón de exportar o algún mensaje de "no hay resultados"
-            WebDriverWait(driver, config["timeouts"]["element_present"]).until(EC.presence_of_element_located((By.ID, "btXLS")))
-            logger.info("Búsqueda completada")
+            WebDriverWait(driver, config["timeouts"]["element_present"]).until(EC.presence_of_element_located((By.ID, report["export_button"])))
+            logger.info(f"[{report['name']}] Búsqueda completada")
             return True
         except TimeoutException:
-            logger.warning("Tiempo de espera agotado al buscar el botón de exportación")
+            logger.warning(f"[{report['name']}] Tiempo de espera agotado al buscar el botón de exportación")
             # Intentamos verificar si hay una tabla de resultados
+            if not report["results_id"]:
+                return False
             try:
-                results_table = driver.find_element(By.ID, "envios")
+                results_table = driver.find_element(By.ID, report["results_id"])
                 if results_table:
-                    logger.info("Se encontró tabla de resultados, continuando")
+                    logger.info(f"[{report['name']}] Se encontró tabla de resultados, continuando")
                     return True
             except NoSuchElementException:
-                logger.warning("No se encontró tabla de resultados")
+                logger.warning(f"[{report['name']}] No se encontró tabla de resultados")
                 return False
     except Exception as e:
-        logger.error(f"Error al realizar la búsqueda: {e}")
+        logger.error(f"[{report['name']}] Error al realizar la búsqueda: {e}")
         return False
 
-def export_to_excel(driver, config):
+def export_report(driver, config, report, download_folder):
     """Exporta los resultados de la búsqueda a Excel y estandariza el nombre del archivo."""
     try:
-        logger.info("Intentando exportar resultados a Excel")
+        logger.info(f"[{report['name']}] Intentando exportar resultados a Excel")
         
         # Verificar si existe el botón de exportar
         try:
             export_button = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.ID, "btXLS"))
+                EC.presence_of_element_located((By.ID, report["export_button"]))
             )
             
             # Generamos el nombre del archivo estandarizado que usaremos
             date_str = get_date_for_filename(config)
             standardized_filename = f"GLS_{date_str}.xls"
-            final_path = os.path.join(config["paths"]["download_folder"], standardized_filename)
+            final_path = os.path.join(download_folder, standardized_filename)
             
             # Si ya existe un archivo con ese nombre, lo eliminamos
             if os.path.exists(final_path):
@@ -304,7 +425,7 @@ def export_to_excel(driver, config):
                 logger.info(f"Archivo existente eliminado: {final_path}")
             
             # Obtener lista de archivos en la carpeta de descargas antes de exportar
-            before_files = set(os.listdir(config["paths"]["download_folder"]))
+            before_files = set(os.listdir(download_folder))
             
             # Hacer clic en el botón de exportar
             export_button.click()
@@ -320,7 +441,7 @@ def export_to_excel(driver, config):
                 wait_time += 1
                 
                 # Obtener lista actual de archivos
-                current_files = set(os.listdir(config["paths"]["download_folder"]))
+                current_files = set(os.listdir(download_folder))
                 
                 # Encontrar archivos nuevos
                 new_files = current_files - before_files
@@ -334,7 +455,7 @@ def export_to_excel(driver, config):
     
                     # Ordenar por fecha de modificación (el más reciente primero)
                     newest_file = max(
-                        [os.path.join(config["paths"]["download_folder"], f) for f in new_excel_files],
+                        [os.path.join(download_folder, f) for f in new_excel_files],
                         key=os.path.getmtime
                     )
                     downloaded_file = newest_file
@@ -379,20 +500,108 @@ def export_to_excel(driver, config):
             logger.warning("No se encontró el botón de exportar, posiblemente no hay resultados")
             
             # Verificar si hay un mensaje de "no hay resultados"
-            try:
-                no_results_msg = driver.find_element(By.ID, "envios")
-                if no_results_msg:
-                    logger.info("No hay resultados para exportar")
-            except NoSuchElementException:
-                logger.warning("No se encontró mensaje de 'no hay resultados'")
+            if report["results_id"]:
+                try:
+                    no_results_msg = driver.find_element(By.ID, report["results_id"])
+                    if no_results_msg:
+                        logger.info(f"[{report['name']}] No hay resultados para exportar")
+                except NoSuchElementException:
+                    logger.warning(f"[{report['name']}] No se encontró mensaje de 'no hay resultados'")
             
             return None
     except Exception as e:
-        logger.error(f"Error al exportar a Excel: {e}")
+        logger.error(f"[{report['name']}] Error al exportar a Excel: {e}")
+        return None
+
+def sniff_file_format(file_path):
+    """Detecta el formato real del archivo: 'html' si es HTML disfrazado de XLS, 'excel' en otro caso."""
+    # Leemos los primeros bytes para determinar si es realmente HTML
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            first_chunk = f.read(1000).lower()
+            if '<!doctype html>' in first_chunk or '<html' in first_chunk or '<form' in first_chunk:
+                logger.info("Archivo detectado como HTML aunque tiene extensión XLS")
+                return "html"
+    except UnicodeDecodeError:
+        # Si falla la decodificación como texto, probablemente es un archivo binario
+        pass
+    return "excel"
+
+def parse_gls_file(file_path, file_format):
+    """Lee un archivo exportado de GLS y devuelve un DataFrame, o None si no se pudo leer."""
+    import pandas as pd
+
+    # Si el archivo es realmente HTML, usamos pandas con el motor html
+    if file_format == "html":
+        try:
+            logger.info("Procesando archivo como HTML con pandas")
+            tables = pd.read_html(file_path)
+            
+            if tables and len(tables) > 0:
+                # Por lo general, la tabla principal es la primera
+                return tables[0]
+            else:
+                logger.error("No se encontraron tablas en el archivo HTML")
+        except Exception as e:
+            logger.error(f"Error al procesar el archivo HTML con pandas: {e}")
+        
+        # Si pandas falla, intentamos una aproximación alternativa - extraer la tabla con BeautifulSoup
+        try:
+            logger.info("Intentando extraer tabla con BeautifulSoup")
+            from bs4 import BeautifulSoup
+            
+            with open(file_path, 'r', encoding='utf-8') as f:
+                soup = BeautifulSoup(f, 'html.parser')
+            
+            # Buscar la tabla (ajustar selectores según el HTML específico de GLS)
+            table = soup.find('table')
+            
+            if table:
+                headers = [th.text.strip() for th in table.find_all('th')]
+                rows = []
+                for row in table.find_all('tr'):
+                    cells = [td.text.strip() for td in row.find_all('td')]
+                    if cells:
+                        rows.append(cells)
+                
+                df = pd.DataFrame(rows)
+                if headers:
+                    # Los encabezados se conservan siempre; si no coinciden con las columnas se rellenan
+                    width = max(len(headers), df.shape[1])
+                    if len(headers) != df.shape[1]:
+                        logger.warning("Los encabezados no coinciden con el número de columnas, se rellenan")
+                    df = df.reindex(columns=range(width))
+                    df.columns = headers + [''] * (width - len(headers))
+                logger.info("Tabla extraída con BeautifulSoup")
+                return df
+            else:
+                logger.error("No se encontró ninguna tabla en el HTML con BeautifulSoup")
+        except Exception as e:
+            logger.error(f"Error al extraer tabla con BeautifulSoup: {e}")
         return None
+    
+    # Si no es HTML, intentamos procesarlo como un archivo Excel normal con diferentes engines
+    logger.info("Intentando procesar como Excel verdadero")
+    engines = ['openpyxl', 'xlrd', 'pyxlsb', None]
+    
+    for engine in engines:
+        try:
+            if engine:
+                logger.info(f"Intentando con motor: {engine}")
+                return pd.read_excel(file_path, engine=engine)
+            else:
+                logger.info("Intentando sin especificar motor")
+                return pd.read_excel(file_path)
+        except Exception as e:
+            logger.warning(f"Falló con motor {engine}: {e}")
+            continue
+    
+    # Si llegamos aquí, todos los intentos fallaron
+    logger.error("Todos los intentos de leer el archivo como Excel fallaron")
+    return None
 
-def process_excel_file(excel_file_path, config):
-    """Procesa el archivo descargado y lo convierte a XLSX."""
+def process_excel_file(excel_file_path, config, output_name="{date}.xlsx"):
+    """Procesa el archivo descargado y lo convierte a XLSX con el nombre de salida indicado."""
     try:
         if not excel_file_path or not os.path.exists(excel_file_path):
             logger.error(f"No se puede procesar un archivo que no existe: {excel_file_path}")
@@ -402,129 +611,29 @@ def process_excel_file(excel_file_path, config):
         date_str = get_date_for_filename(config)
         
         # Nombre del archivo destino
-        final_path = os.path.join(config["paths"]["final_folder"], f"{date_str}.xlsx")
+        final_path = os.path.join(config["paths"]["final_folder"], output_name.format(date=date_str))
         
-        # Detectar el formato real del archivo
-        # Primero leemos los primeros bytes para determinar si es realmente HTML
-        is_html = False
-        try:
-            with open(excel_file_path, 'r', encoding='utf-8') as f:
-                first_chunk = f.read(1000).lower()
-                if '<!doctype html>' in first_chunk or '<html' in first_chunk or '<form' in first_chunk:
-                    is_html = True
-                    logger.info("Archivo detectado como HTML aunque tiene extensión XLS")
-        except UnicodeDecodeError:
-            # Si falla la decodificación como texto, probablemente es un archivo binario
-            is_html = False
-        
-        # Si el archivo es realmente HTML, usamos pandas con el motor html
-        if is_html:
-            try:
-                import pandas as pd
-                
-                # Leer el archivo como HTML
-                logger.info("Procesando archivo como HTML con pandas")
-                tables = pd.read_html(excel_file_path)
-                
-                if tables and len(tables) > 0:
-                    # Por lo general, la tabla principal es la primera
-                    df = tables[0]
-                    
-                    # Guardar como XLSX
-                    df.to_excel(final_path, index=False)
-                    logger.info(f"Archivo HTML convertido y guardado como XLSX: {final_path}")
-                    return True
-                else:
-                    logger.error("No se encontraron tablas en el archivo HTML")
-            except Exception as e:
-                logger.error(f"Error al procesar el archivo HTML con pandas: {e}")
-                
-                # Si pandas falla, intentamos una aproximación alternativa - extraer la tabla con BeautifulSoup
+        # Detectar el formato real del archivo y leerlo
+        file_format = sniff_file_format(excel_file_path)
+        df = parse_gls_file(excel_file_path, file_format)
+        
+        if df is None:
+            if file_format == "html":
+                # Si todo lo demás falla, guardamos una copia del HTML original
                 try:
-                    logger.info("Intentando extraer tabla con BeautifulSoup")
-                    from bs4 import BeautifulSoup
-                    from openpyxl import Workbook  # Importar la librería para trabajar con Excel
-                    
-                    # Leer el archivo HTML
-                    with open(excel_file_path, 'r', encoding='utf-8') as f:
-                        soup = BeautifulSoup(f, 'html.parser')
-                    
-                    # Buscar la tabla (ajustar selectores según el HTML específico de GLS)
-                    table = soup.find('table')
-                    
-                    if table:
-                        # Crear un nuevo libro de Excel y seleccionar la hoja activa
-                        wb = Workbook()
-                        ws = wb.active
-                        
-                        # Extraer encabezados
-                        headers = [th.text.strip() for th in table.find_all('th')]
-                        if headers:
-                            ws.append(headers)  # Escribir los encabezados en la primera fila
-                        
-                        # Extraer filas
-                        for row in table.find_all('tr'):
-                            cells = [td.text.strip() for td in row.find_all('td')]
-                            if cells:
-                                ws.append(cells)  # Escribir cada fila en el archivo de Excel
-                        
-                        # Guardar el archivo de Excel
-                        wb.save(final_path)
-                        
-                        logger.info(f"Tabla extraída con BeautifulSoup y guardada como Excel: {final_path}")
-                        return True
-                    else:
-                        logger.error("No se encontró ninguna tabla en el HTML con BeautifulSoup")
-                except Exception as e:
-                    logger.error(f"Error al extraer tabla con BeautifulSoup: {e}")
-                    
-                    # Si todo lo demás falla, guardamos una copia del HTML original
-                    try:
-                        import shutil
-                        html_path = os.path.join(config["paths"]["final_folder"], f"GLS_{date_str}.html")
-                        shutil.copy2(excel_file_path, html_path)
-                        logger.info(f"Se guardó una copia del HTML original: {html_path}")
-                        
-                        # También podemos intentar abrir el HTML en un navegador y exportarlo manualmente
-                        # Esto dependerá de si tienes una implementación específica para esto
-                        return False
-                    except Exception as copy_error:
-                        logger.error(f"Error al copiar el archivo HTML: {copy_error}")
-                        return False
-        
-        # Si no es HTML, intentamos procesarlo como un archivo Excel normal
-        else:
-            try:
-                import pandas as pd
-                
-                # Intentar con diferentes engines
-                logger.info("Intentando procesar como Excel verdadero")
-                engines = ['openpyxl', 'xlrd', 'pyxlsb', None]
-                
-                for engine in engines:
-                    try:
-                        if engine:
-                            logger.info(f"Intentando con motor: {engine}")
-                            df = pd.read_excel(excel_file_path, engine=engine)
-                        else:
-                            logger.info("Intentando sin especificar motor")
-                            df = pd.read_excel(excel_file_path)
-                        
-                        # Si llegamos aquí, la lectura fue exitosa
-                        df.to_excel(final_path, index=False)
-                        logger.info(f"Archivo convertido y guardado exitosamente: {final_path}")
-                        return True
-                    except Exception as e:
-                        logger.warning(f"Falló con motor {engine}: {e}")
-                        continue
-                
-                # Si llegamos aquí, todos los intentos fallaron
-                logger.error("Todos los intentos de leer el archivo como Excel fallaron")
-                return False
-                
-            except Exception as e:
-                logger.error(f"Error general al procesar el archivo: {e}")
-                return False
+                    import shutil
+                    html_name = os.path.splitext(output_name.format(date=date_str))[0] + ".html"
+                    html_path = os.path.join(config["paths"]["final_folder"], html_name)
+                    shutil.copy2(excel_file_path, html_path)
+                    logger.info(f"Se guardó una copia del HTML original: {html_path}")
+                except Exception as copy_error:
+                    logger.error(f"Error al copiar el archivo HTML: {copy_error}")
+            return False
+        
+        # Guardar como XLSX
+        df.to_excel(final_path, index=False)
+        logger.info(f"Archivo convertido y guardado exitosamente: {final_path}")
+        return True
             
     except Exception as e:
         logger.error(f"Error al procesar el archivo: {e}")
@@ -554,7 +663,7 @@ def conection_db(config):
         return engine
 
     except Exception as c:
-        print(c)
+        logger.error(f"Error al conectar con la base de datos: {c}")
 
 def get_data_ps(config):
     import pandas as pd
@@ -575,10 +684,36 @@ def get_data_ps(config):
     
     return df_orders_ps
 
-def updated_excel(config):
+def reconcile_orders(df_excel, df_referencia):
+    """Añade id_order_ps y reference_ps a los envíos cruzando DptoDst con los pedidos de PrestaShop."""
+    # Crear las nuevas columnas con valores vacíos
+    df_excel['id_order_ps'] = ''
+    df_excel['reference_ps'] = ''
+    
+    # Iterar sobre las filas del Excel original
+    for index, fila in df_excel.iterrows():
+        valor_dpto_dst = fila['DptoDst']
+        
+        # Buscar coincidencia en el dataframe de referencia
+        coincidencia_marketplace = df_referencia[df_referencia['marketplace_order_id'] == valor_dpto_dst]
+        coincidencia_reference = df_referencia[df_referencia['reference_ps'] == valor_dpto_dst]
+        
+        # Si hay coincidencia con marketplace_order_id
+        if not coincidencia_marketplace.empty:
+            df_excel.at[index, 'id_order_ps'] = coincidencia_marketplace['id_order_ps'].values[0]
+            df_excel.at[index, 'reference_ps'] = coincidencia_marketplace['reference_ps'].values[0]
+        
+        # Si hay coincidencia con reference_ps
+        elif not coincidencia_reference.empty:
+            df_excel.at[index, 'id_order_ps'] = coincidencia_reference['id_order_ps'].values[0]
+            df_excel.at[index, 'reference_ps'] = coincidencia_reference['reference_ps'].values[0]
+    
+    return df_excel
+
+def updated_excel(config, output_name="{date}.xlsx"):
     import pandas as pd
     try:
-        path_file = os.path.join(config["paths"]["final_folder"], f"{get_date_for_filename()}.xlsx")
+        path_file = os.path.join(config["paths"]["final_folder"], output_name.format(date=get_date_for_filename(config)))
 
         # Cargar el archivo Excel original
         df_excel = pd.read_excel(path_file)
@@ -586,31 +721,11 @@ def updated_excel(config):
         # Cargar el dataframe de referencia
         df_referencia = get_data_ps(config)
         
-        # Crear las nuevas columnas con valores vacíos
-        df_excel['id_order_ps'] = ''
-        df_excel['reference_ps'] = ''
-        
-        # Iterar sobre las filas del Excel original
-        for index, fila in df_excel.iterrows():
-            valor_dpto_dst = fila['DptoDst']
-            
-            # Buscar coincidencia en el dataframe de referencia
-            coincidencia_marketplace = df_referencia[df_referencia['marketplace_order_id'] == valor_dpto_dst]
-            coincidencia_reference = df_referencia[df_referencia['reference_ps'] == valor_dpto_dst]
-            
-            # Si hay coincidencia con marketplace_order_id
-            if not coincidencia_marketplace.empty:
-                df_excel.at[index, 'id_order_ps'] = coincidencia_marketplace['id_order_ps'].values[0]
-                df_excel.at[index, 'reference_ps'] = coincidencia_marketplace['reference_ps'].values[0]
-            
-            # Si hay coincidencia con reference_ps
-            elif not coincidencia_reference.empty:
-                df_excel.at[index, 'id_order_ps'] = coincidencia_reference['id_order_ps'].values[0]
-                df_excel.at[index, 'reference_ps'] = coincidencia_reference['reference_ps'].values[0]
+        df_excel = reconcile_orders(df_excel, df_referencia)
         
         # Guardar los cambios al archivo Excel
         df_excel.to_excel(path_file, index=False)
-        print(f"El archivo '{path_file}' ha sido actualizado con éxito.")
+        logger.info(f"El archivo '{path_file}' ha sido actualizado con éxito.")
 
         return True
     
@@ -618,6 +733,68 @@ def updated_excel(config):
         logger.error(f"Error al actualizar el archivo Excel: {e}")
         return False
 
+def run_report(driver, config, report):
+    """Ejecuta búsqueda, exportación y procesado de un informe en un navegador con la sesión iniciada."""
+    download_folder = get_report_download_folder(config, report)
+    
+    # Navegar a la página de búsqueda del informe
+    if not navigate_to_report(driver, config, report):
+        return False
+    
+    # Realizar búsqueda
+    if not search_report(driver, config, report):
+        return False
+    
+    # Exportar resultados a Excel
+    excel_file_path = export_report(driver, config, report, download_folder)
+    
+    # Si hay archivo para procesar, lo convertimos a XLSX
+    if excel_file_path:
+        result = process_excel_file(excel_file_path, config, report["output_name"])
+        
+        if result and os.path.exists(excel_file_path):
+            
+            # Conciliar con PrestaShop si el informe lo requiere
+            updated_file = updated_excel(config, report["output_name"]) if report["reconcile"] else True
+            
+            # Opcional: eliminar el archivo Excel original después de procesar
+            if updated_file and os.path.exists(excel_file_path):
+                try:
+                    os.remove(excel_file_path)
+                    logger.info(f"[{report['name']}] Archivo original eliminado: {excel_file_path}")
+                except:
+                    logger.warning(f"[{report['name']}] No se pudo eliminar el archivo original: {excel_file_path}")
+        
+        return result
+    else:
+        logger.info(f"[{report['name']}] No hay archivos para procesar")
+        return True  # Consideramos éxito aunque no haya archivos (puede ser normal)
+
+def run_report_in_new_browser(session_cookies, config, report, driver_lock):
+    """Abre un navegador propio para el informe, le copia las cookies de la sesión y lo ejecuta."""
+    driver = None
+    name = report.get("name")
+    try:
+        # La creación de drivers se serializa para que webdriver_manager no descargue en paralelo
+        with driver_lock:
+            driver = setup_selenium_driver(config, get_report_download_folder(config, report))
+        if not driver:
+            return False
+        
+        if not share_session(session_cookies, driver, config, report):
+            return False
+        
+        return run_report(driver, config, report)
+    except Exception as e:
+        logger.error(f"[{name}] Error al ejecutar el informe: {e}")
+        return False
+    finally:
+        if driver:
+            try:
+                driver.quit()
+            except:
+                logger.warning(f"[{name}] Error al cerrar el driver de Selenium")
+
 def rpa_shipments():
     """Función principal que ejecuta el flujo completo de RPA para envíos GLS."""
     driver = None
@@ -625,45 +802,36 @@ def rpa_shipments():
         # Cargar configuración
         config = load_config()
         
-        # Configurar el driver de Selenium
-        driver = setup_selenium_driver(config)
+        reports = config["reports"]
+        
+        # Configurar el driver de Selenium; el primer informe descarga en este navegador
+        driver = setup_selenium_driver(config, get_report_download_folder(config, reports[0]))
         if not driver:
             return False
         
-        # Realizar login en GLS
+        # Realizar login en GLS (una sola vez para todos los informes)
         if not login_to_gls(driver, config):
             return False
         
-        # Navegar a la página de búsqueda de envíos
-        if not navigate_to_shipments(driver, config):
-            return False
-        
-        # Realizar búsqueda de envíos
-        if not search_shipments(driver, config):
-            return False
-        
-        # Exportar resultados a Excel
-        excel_file_path = export_to_excel(driver, config)
-        
-        # Si hay archivo para procesar, lo convertimos a XLSX
-        if excel_file_path:
-            result = process_excel_file(excel_file_path, config)
-            
-            if result and os.path.exists(excel_file_path):
-
-                # Opcional: eliminar el archivo Excel original después de procesar
-                updated_file = updated_excel(config)
-                if updated_file and os.path.exists(excel_file_path):
-                    try:
-                        os.remove(excel_file_path)
-                        logger.info(f"Archivo original eliminado: {excel_file_path}")
-                    except:
-                        logger.warning(f"No se pudo eliminar el archivo original: {excel_file_path}")
-            
-            return result
-        else:
-            logger.info("No hay archivos para procesar")
-            return True  # Consideramos éxito aunque no haya archivos (puede ser normal)
+        if len(reports) == 1:
+            return run_report(driver, config, reports[0])
+        
+        # Un WebDriver no puede manejar varias pestañas a la vez, así que cada informe adicional
+        # usa su propio navegador con las cookies de la sesión ya iniciada
+        logger.info(f"Ejecutando {len(reports)} informes en paralelo")
+        session_cookies = driver.get_cookies()
+        driver_lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=len(reports)) as executor:
+            futures = [executor.submit(run_report, driver, config, reports[0])]
+            futures += [
+                executor.submit(run_report_in_new_browser, session_cookies, config, report, driver_lock)
+                for report in reports[1:]
+            ]
+            results = [future.result() for future in futures]
+        
+        for report, result in zip(reports, results):
+            logger.info(f"[{report['name']}] {'Completado' if result else 'Fallido'}")
+        return all(results)
         
     except Exception as e:
         logger.error(f"Error en el proceso RPA: {e}")
@@ -7,6 +7,10 @@ $ProjectPath = "C:\Users\junior.marketing\Documents\rpa_downloads_extranet_gls"
 $LogPath = "$ProjectPath\logs"
 $VenvPath = "$ProjectPath\.venv"
 
+# El proceso Python escribe su propio log rotativo; sin consola para no duplicarlo en scheduler_*.log
+$env:LOG_FILE = "$LogPath\rpa_shipments.log"
+$env:LOG_CONSOLE = "0"
+
 # Crear directorio de logs si no existe
 if (-not (Test-Path $LogPath)) {
     New-Item -ItemType Directory -Path $LogPath -Force